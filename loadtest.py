@@ -0,0 +1,834 @@
+"""
+AutoAbsen SimKuliah USK - Load Test Harness
+Simulasi banyak dashboard (browser) dan engine terhadap SimKuliah palsu lokal.
+
+Usage:
+    python loadtest.py --browsers 20 --engines 10 --duration 600
+    python loadtest.py --latency 800 --failure-rate 0.1 --json run.json
+    python loadtest.py --json new.json --compare run.json
+    python loadtest.py --target http://127.0.0.1:3000 --stub-port 8765
+
+By default a gunicorn instance of server.py is spawned (1 worker, --threads 4,
+same as the Procfile) with SIMKULIAH_BASE pointing at the stub. The stub and
+the simulated engines each run in their own process, so they don't share a GIL
+with the browsers and each gets its own threads/RSS row:
+
+    server   gunicorn master + worker, including its own engine_loop
+    stub     the fake SimKuliah
+    engines  M engines running check_and_absen(), own SimKuliah session each
+    clients  N browsers polling the API the same way app.js does
+
+check_and_absen() and fetch_schedule() write HTML into debug/ via save_debug()
+on every call; those writes are part of the measured cost.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import logging
+import subprocess
+from threading import Thread, Event, Lock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STUB_COOKIE = 'stub_user'
+
+COURSES = [
+    ('INF101', 'Algoritma dan Pemrograman', 'Senin', '08.00 - 09.40'),
+    ('INF102', 'Struktur Data', 'Senin', '10.45 - 12.25'),
+    ('INF201', 'Basis Data', 'Selasa', '08.00 - 09.40'),
+    ('INF202', 'Jaringan Komputer', 'Rabu', '14.00 - 15.40'),
+    ('INF203', 'Sistem Operasi', 'Kamis', '08.00 - 10.30'),
+    ('INF301', 'Rekayasa Perangkat Lunak', 'Jumat', '08.00 - 09.40'),
+]
+
+
+# ===== Fake SimKuliah =====
+class FakeSimKuliah:
+    """
+    Minimal SimKuliah stand-in serving the pages server.py scrapes.
+
+    Attendance windows open every `window_every` seconds for every user and
+    stay open for `window_length` seconds. A window counts as attended only if
+    konfirmasi_kehadiran arrives while it is still open.
+    """
+
+    def __init__(self, latency_ms=0, jitter_ms=0, failure_rate=0.0,
+                 window_every=60, window_length=30, seed=0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.failure_rate = failure_rate
+        self.window_every = window_every
+        self.window_length = window_length
+        self.rng = random.Random(seed)
+        self.lock = Lock()
+        self.t0 = time.monotonic()
+        self.attended = {}  # {(user_idx, window_idx): seconds after window opened}
+        self.requests = 0
+        self.failures = 0
+        self.httpd = None
+
+    # --- window bookkeeping ---
+    def open_window(self):
+        """Index of the currently open window, or None."""
+        elapsed = time.monotonic() - self.t0
+        k = int(elapsed // self.window_every)
+        if elapsed - k * self.window_every < self.window_length:
+            return k
+        return None
+
+    def closed_windows(self):
+        """Number of windows that have fully closed since t0."""
+        elapsed = time.monotonic() - self.t0
+        if elapsed < self.window_length:
+            return 0
+        return int((elapsed - self.window_length) // self.window_every) + 1
+
+    @staticmethod
+    def absen_id(user_idx, k):
+        return (user_idx + 1) * 100000 + k
+
+    def confirm(self, absen_id, user_idx):
+        if user_idx is None or not absen_id.isdigit():
+            return 'gagal: permintaan tidak valid'
+        owner, k = divmod(int(absen_id), 100000)
+        if owner - 1 != user_idx:
+            return 'gagal: permintaan tidak valid'
+        with self.lock:
+            if k != self.open_window():
+                return 'gagal: absensi ditutup'
+            if (user_idx, k) in self.attended:
+                return 'sudah absen'
+            lag = time.monotonic() - self.t0 - k * self.window_every
+            self.attended[(user_idx, k)] = lag
+        return 'success'
+
+    def reset(self):
+        """Start counting windows from now and forget confirmations made during setup."""
+        with self.lock:
+            self.t0 = time.monotonic()
+            self.attended.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'closed_windows': self.closed_windows(),
+                'attended': [[user, k, lag] for (user, k), lag in self.attended.items()],
+                'requests': self.requests,
+                'failures': self.failures,
+            }
+
+    # --- request shaping ---
+    def delay_and_fail(self):
+        """Sleep for the configured latency; return True to inject a failure."""
+        with self.lock:
+            delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+            fail = self.rng.random() < self.failure_rate
+            self.requests += 1
+            if fail:
+                self.failures += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    # --- pages ---
+    def login_page(self):
+        return ('<html><body><h3>Login dengan akun SIMPEG</h3>'
+                '<form method="post" action="/index.php/login/auth">'
+                '<input name="username"><input name="password" type="password">'
+                '</form></body></html>')
+
+    def dashboard_page(self, user_idx):
+        return ('<html><body><div class="user-profile"><img src="#">'
+                f'<span>MAHASISWA LOADTEST {user_idx}</span></div>'
+                '<a href="/index.php/absensi">Absensi</a>'
+                '<a href="/index.php/login/logout">Logout</a></body></html>')
+
+    def jadwal_page(self):
+        rows = ''.join(
+            f'<tr><td>{code}</td><td>{name} (Kelas : 01)(SKS Mengajar : 3)</td>'
+            f'<td>Hari, tanggal : {day}, 11-02-2026<br>Jam : {jam}</td></tr>'
+            for code, name, day, jam in COURSES
+        )
+        return ('<html><body><table id="simpletable">'
+                '<tr><th>Kode</th><th>Mata Kuliah</th><th>Pertemuan 1</th></tr>'
+                f'{rows}</table></body></html>')
+
+    def absensi_page(self, user_idx):
+        k = self.open_window()
+        if k is None:
+            return '<html><body><p>Tidak ada kelas yang sedang berlangsung.</p></body></html>'
+        if (user_idx, k) in self.attended:
+            return '<html><body><p>Anda sudah absen pada kelas ini.</p></body></html>'
+        code, name = COURSES[k % len(COURSES)][:2]
+        absen_id = self.absen_id(user_idx, k)
+        return (
+            '<html><body>'
+            f'<h4>Absensi Kelas | {code} {name} | Pertemuan {k + 1}</h4>'
+            '<p>Anda belum absen</p>'
+            f'<button id="konfirmasi-kehadiran-{absen_id}">Konfirmasi Kehadiran</button>'
+            '<script>'
+            f'$("#konfirmasi-kehadiran-{absen_id}").on("click", function() {{\n'
+            "  var kelas = '01';\n"
+            f"  var kd_mt_kul_8 = '{code}';\n"
+            "  var jadwal_mulai = '08:00';\n"
+            "  var jadwal_berakhir = '09:40';\n"
+            f"  var pertemuan = '{k + 1}';\n"
+            "  var sks_mengajar = '3';\n"
+            f"  var id = '{absen_id}';\n"
+            '});</script></body></html>'
+        )
+
+    # --- server lifecycle ---
+    def serve(self, port):
+        """Serve on 127.0.0.1:port until the process is killed."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def user_idx(self):
+                match = re.search(rf'{STUB_COOKIE}=loadtest(\d+)', self.headers.get('Cookie', ''))
+                return int(match.group(1)) if match else None
+
+            def send(self, body, status=200, cookie=None, content_type='text/html'):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                if cookie:
+                    self.send_header('Set-Cookie', f'{STUB_COOKIE}={cookie}; Path=/')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = self.path.split('?')[0].rstrip('/')
+                # Control route for the harness: no latency, no failures, not counted
+                if path == '/__loadtest/stats':
+                    return self.send(json.dumps(stub.stats()), content_type='application/json')
+                if stub.delay_and_fail():
+                    return self.send('Service Unavailable', 503)
+                if path == '':
+                    self.send(stub.login_page())
+                elif path == '/index.php/jadwal_kuliah/index':
+                    self.send(stub.jadwal_page())
+                elif path == '/index.php/absensi':
+                    user_idx = self.user_idx()
+                    if user_idx is None:
+                        return self.send('Forbidden', 403)
+                    self.send(stub.absensi_page(user_idx))
+                else:
+                    self.send('Not Found', 404)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                path = self.path.split('?')[0]
+                if path == '/__loadtest/reset':
+                    stub.reset()
+                    return self.send('ok')
+                if stub.delay_and_fail():
+                    return self.send('Service Unavailable', 503)
+                if path == '/index.php/login/auth':
+                    username = form.get('username', [''])[0]
+                    match = re.fullmatch(r'loadtest(\d+)', username)
+                    if not match:
+                        return self.send(stub.login_page())
+                    self.send(stub.dashboard_page(int(match.group(1))), cookie=username)
+                elif path == '/index.php/absensi/konfirmasi_kehadiran':
+                    self.send(stub.confirm(form.get('id', [''])[0], self.user_idx()))
+                else:
+                    self.send('Not Found', 404)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.serve_forever()
+
+
+# ===== Measurement Helpers =====
+class Recorder:
+    """Thread-safe latency/error collector keyed by endpoint."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.samples = {}  # {name: [latency_seconds, ...]}
+        self.errors = {}   # {name: count}
+
+    def record(self, name, seconds, ok=True):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def merge(self, samples, errors):
+        """Fold in samples collected by another process."""
+        with self.lock:
+            for name, values in samples.items():
+                self.samples.setdefault(name, []).extend(values)
+            for name, count in errors.items():
+                self.errors[name] = self.errors.get(name, 0) + count
+
+    def summary(self, elapsed):
+        out = {}
+        with self.lock:
+            for name in sorted(self.samples):
+                values = sorted(self.samples[name])
+                errors = self.errors.get(name, 0)
+                out[name] = {
+                    'requests': len(values),
+                    'errors': errors,
+                    'throughput_rps': round((len(values) - errors) / elapsed, 2),
+                    'p50_ms': round(percentile(values, 50) * 1000, 1),
+                    'p99_ms': round(percentile(values, 99) * 1000, 1),
+                    'max_ms': round(values[-1] * 1000, 1),
+                }
+        return out
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def proc_stats(pid):
+    """(threads, rss_kb) for a pid from /proc, or None if unavailable."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            status = f.read()
+    except OSError:
+        return None
+    threads = re.search(r'^Threads:\s+(\d+)', status, re.MULTILINE)
+    rss = re.search(r'^VmRSS:\s+(\d+)', status, re.MULTILINE)
+    return int(threads.group(1)) if threads else 0, int(rss.group(1)) if rss else 0
+
+
+def process_tree(pid):
+    """The pid plus all of its descendants (gunicorn master + workers)."""
+    children = {}
+    for entry in os.listdir('/proc') if os.path.isdir('/proc') else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        tree.append(p)
+        stack.extend(children.get(p, []))
+    return tree
+
+
+class ResourceSampler(Thread):
+    """Samples thread count and RSS of labelled processes once per interval."""
+
+    def __init__(self, pids, stop_event, trees=(), interval=1.0):
+        super().__init__(daemon=True)
+        self.pids = pids  # {label: pid}
+        self.trees = set(trees)  # labels whose descendants are included
+        self.stop_event = stop_event
+        self.interval = interval
+        self.peak = {label: {'threads': 0, 'rss_mb': 0.0} for label in pids}
+        self.last = {label: {'threads': 0, 'rss_mb': 0.0} for label in pids}
+
+    def sample(self):
+        for label, root in self.pids.items():
+            threads, rss_kb = 0, 0
+            for pid in process_tree(root) if label in self.trees else [root]:
+                stats = proc_stats(pid)
+                if stats:
+                    threads += stats[0]
+                    rss_kb += stats[1]
+            current = {'threads': threads, 'rss_mb': round(rss_kb / 1024, 1)}
+            self.last[label] = current
+            for key, value in current.items():
+                self.peak[label][key] = max(self.peak[label][key], value)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.sample()
+            self.stop_event.wait(self.interval)
+
+    def summary(self):
+        return {label: {'peak_threads': self.peak[label]['threads'],
+                        'peak_rss_mb': self.peak[label]['rss_mb'],
+                        'final_threads': self.last[label]['threads'],
+                        'final_rss_mb': self.last[label]['rss_mb']}
+                for label in self.pids}
+
+
+# ===== Simulated Clients =====
+def api_ok(body):
+    """server.py answers HTTP 200 with success=False on failure."""
+    return body.get('success') is not False
+
+
+def schedule_ok(body):
+    """The stub always serves COURSES, so an empty schedule means the upstream fetch failed."""
+    return api_ok(body) and bool(body.get('schedule'))
+
+
+def timed(recorder, name, func, *args, check=api_ok, **kwargs):
+    """
+    Run an HTTP call and record its latency. Exceptions, non-2xx responses,
+    non-JSON bodies and bodies rejected by `check` are counted as errors.
+    """
+    start = time.perf_counter()
+    try:
+        res = func(*args, **kwargs)
+        ok = res.ok and check(res.json())
+    except (requests.RequestException, ValueError):
+        res, ok = None, False
+    recorder.record(name, time.perf_counter() - start, ok)
+    return res
+
+
+def browser_loop(idx, base_url, args, recorder, stop_event):
+    """One dashboard tab: ping + schedule on load, then poll /api/status like app.js."""
+    rng = random.Random(args.seed * 1000 + idx)
+    s = requests.Session()
+    timeout = args.request_timeout
+
+    # Stagger page loads so browsers don't poll in lockstep
+    if stop_event.wait(rng.uniform(0, args.status_interval)):
+        return
+    timed(recorder, 'POST /api/ping', s.post, f'{base_url}/api/ping', timeout=timeout)
+    timed(recorder, 'GET /api/schedule', s.get, f'{base_url}/api/schedule',
+          check=schedule_ok, timeout=timeout)
+
+    now = time.monotonic()
+    next_status = now
+    next_ping = now + args.ping_interval
+    next_schedule = now + args.schedule_interval if args.schedule_interval > 0 else float('inf')
+    while not stop_event.is_set():
+        now = time.monotonic()
+        if now >= next_status:
+            timed(recorder, 'GET /api/status', s.get, f'{base_url}/api/status', timeout=timeout)
+            next_status += args.status_interval
+        if now >= next_ping:
+            timed(recorder, 'POST /api/ping', s.post, f'{base_url}/api/ping', timeout=timeout)
+            next_ping += args.ping_interval
+        if now >= next_schedule:
+            timed(recorder, 'GET /api/schedule', s.get, f'{base_url}/api/schedule',
+                  check=schedule_ok, timeout=timeout)
+            next_schedule += args.schedule_interval
+        stop_event.wait(max(0, min(next_status, next_ping, next_schedule) - time.monotonic()))
+
+
+def watch_failures(s):
+    """
+    Wrap a session so every failed SimKuliah call is remembered.
+
+    check_and_absen() reads a 503 absensi page as "no active class" and
+    swallows exceptions, so its return value can't tell a failure apart.
+    """
+    failed = []
+    send = s.request
+
+    def request(*args, **kwargs):
+        try:
+            res = send(*args, **kwargs)
+        except requests.RequestException:
+            failed.append(None)
+            raise
+        if not res.ok:
+            failed.append(res.status_code)
+        return res
+
+    s.request = request
+    return failed
+
+
+def engine_worker(idx, server, args, recorder, counters, stop_event):
+    """One engine: its own SimKuliah session running check_and_absen() periodically."""
+    npm = f'loadtest{idx + 1}'  # loadtest0 is the server's own login
+    s = None
+    while s is None and not stop_event.is_set():
+        start = time.perf_counter()
+        s, _ = server.login_simkuliah(npm, 'loadtest')
+        recorder.record('engine login', time.perf_counter() - start, s is not None)
+        if s is None:
+            stop_event.wait(1)
+
+    if s is None:
+        return
+    failed = watch_failures(s)
+
+    # Spread engines across the first interval, like students starting at different times
+    stop_event.wait(random.Random(args.seed * 1000 + idx).uniform(0, args.engine_interval))
+    while not stop_event.is_set():
+        failed.clear()
+        start = time.perf_counter()
+        server.check_and_absen(s)
+        took = time.perf_counter() - start
+        recorder.record('engine check_and_absen', took, not failed)
+        with counters['lock']:
+            counters['cycles'] += 1
+            if took > args.engine_interval:
+                counters['overruns'] += 1
+        stop_event.wait(max(0, args.engine_interval - took))
+
+
+def run_engines(args):
+    """--role engines: run the M engines for --duration, then dump raw samples as JSON."""
+    sys.path.insert(0, HERE)
+    import server
+    logging.getLogger(server.__name__).setLevel(logging.ERROR)
+
+    recorder = Recorder()
+    stop_event = Event()
+    counters = {'lock': Lock(), 'cycles': 0, 'overruns': 0}
+    workers = [Thread(target=engine_worker, args=(i, server, args, recorder, counters, stop_event),
+                      daemon=True)
+               for i in range(args.engines)]
+    for worker in workers:
+        worker.start()
+    stop_event.wait(args.duration)
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=args.request_timeout)
+
+    with recorder.lock:
+        json.dump({'samples': recorder.samples, 'errors': recorder.errors,
+                   'cycles': counters['cycles'], 'overruns': counters['overruns']}, sys.stdout)
+
+
+# ===== Processes =====
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_role(role, argv, stub_port, **kwargs):
+    """Re-run this script with --role so the stub/engines get their own process."""
+    cmd = [sys.executable, os.path.abspath(__file__), *argv,
+           '--role', role, '--stub-port', str(stub_port)]
+    return subprocess.Popen(cmd, cwd=HERE, **kwargs)
+
+
+def spawn_stub(argv, port):
+    proc = spawn_role('stub', argv, port)
+    stub_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'stub exited with code {proc.returncode}')
+        try:
+            requests.get(f'{stub_url}/__loadtest/stats', timeout=1)
+            return proc, stub_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError('stub did not become ready within 10s')
+
+
+def stub_stats(stub_url):
+    return requests.get(f'{stub_url}/__loadtest/stats', timeout=10).json()
+
+
+def stop_process(proc):
+    if proc and proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def spawn_server(stub_url, threads):
+    port = free_port()
+    env = dict(os.environ, SIMKULIAH_BASE=stub_url)
+    cmd = [sys.executable, '-m', 'gunicorn', 'server:app', '--bind', f'127.0.0.1:{port}',
+           '--workers', '1', '--threads', str(threads), '--timeout', '120']
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with code {proc.returncode}')
+        try:
+            requests.get(f'{base_url}/api/test', timeout=1)
+            return proc, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError('gunicorn did not become ready within 20s')
+
+
+def start_server_engine(base_url, timeout):
+    """Start the server's own engine_loop (mode 1), the one engine a deployment runs."""
+    try:
+        res = requests.post(f'{base_url}/api/engine/start', timeout=timeout, json={'absen_mode': 1})
+        return res.ok and res.json().get('success') is True
+    except (requests.RequestException, ValueError):
+        return False
+
+
+def login_server(base_url, timeout, wait):
+    """
+    Log the (single-user) server in against the stub so browsers see a dashboard.
+    Keeps retrying until the server is up and pointed at the stub, or `wait` seconds pass.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            res = requests.post(f'{base_url}/api/login', timeout=timeout,
+                                json={'npm': 'loadtest0', 'password': 'loadtest'})
+            if res.ok and res.json().get('success'):
+                return True
+        except (requests.RequestException, ValueError):
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(1)
+
+
+# ===== Reporting =====
+def flatten(data, prefix=''):
+    """Flatten nested numeric results to {'a.b.c': value} for run-to-run comparison."""
+    out = {}
+    for key, value in data.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            out.update(flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def print_report(report):
+    config, results = report['config'], report['results']
+    print('=' * 78)
+    print('  AutoAbsen Load Test')
+    print('  ' + ', '.join(f'{k}={v}' for k, v in config.items()))
+    print('  resources: server = server under test incl. its engine_loop, stub = fake SimKuliah,')
+    print('  engines = the simulated engines, clients = the simulated browsers')
+    print('=' * 78)
+    print(f'{"endpoint":<30}{"reqs":>7}{"errs":>6}{"rps":>9}{"p50 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+    for name, row in results['endpoints'].items():
+        print(f'{name:<30}{row["requests"]:>7}{row["errors"]:>6}{row["throughput_rps"]:>9}'
+              f'{row["p50_ms"]:>9}{row["p99_ms"]:>9}{row["max_ms"]:>9}')
+    print('-' * 78)
+    setup = results['setup']
+    if not setup['server_logged_in'] or not setup['server_engine_running']:
+        print(f'WARNING: server logged in={setup["server_logged_in"]}, '
+              f'engine running={setup["server_engine_running"]}; not comparable to a normal run')
+    total = results['total']
+    print(f'total: {total["requests"]} requests, {total["errors"]} errors, '
+          f'{total["throughput_rps"]} req/s over {results["elapsed_s"]}s')
+    for label, row in results['resources'].items():
+        print(f'{label}: threads peak {row["peak_threads"]} (final {row["final_threads"]}), '
+              f'RSS peak {row["peak_rss_mb"]} MB (final {row["final_rss_mb"]} MB)')
+    att = results['attendance']
+    print(f'attendance: {att["attended"]}/{att["windows"]} windows attended, '
+          f'{att["missed"]} missed, lag p50 {att["lag_p50_s"]}s p99 {att["lag_p99_s"]}s')
+    own = results['server_engine']
+    print(f'server engine_loop: {own["attended"]}/{own["windows"]} windows attended, '
+          f'{own["missed"]} missed')
+    eng = results['engines']
+    print(f'engines: {eng["cycles"]} cycles, {eng["overruns"]} overran the interval')
+    stub = results['stub']
+    print(f'stub: {stub["requests"]} requests, {stub["injected_failures"]} injected failures')
+
+
+def print_comparison(previous, current):
+    before, after = flatten(previous['results']), flatten(current['results'])
+    if previous.get('config') != current.get('config'):
+        print('warning: configs differ, deltas may not be meaningful')
+    print(f'{"metric":<48}{"before":>10}{"after":>10}{"delta":>10}')
+    for key in sorted(set(before) | set(after)):
+        old, new = before.get(key), after.get(key)
+        if old is None:
+            old, delta = '-', 'new'
+        elif new is None:
+            new, delta = '-', 'gone'
+        elif old:
+            delta = f'{(new - old) / old * 100:+.1f}%'
+        else:
+            delta = '=' if new == old else f'{new - old:+g}'
+        print(f'{key:<48}{old:>10}{new:>10}{delta:>10}')
+
+
+# ===== Main =====
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description='Load test AutoAbsen against a fake SimKuliah.')
+    p.add_argument('--browsers', type=int, default=10, help='simulated dashboard tabs')
+    p.add_argument('--engines', type=int, default=5, help='simulated engines (own SimKuliah session each)')
+    p.add_argument('--duration', type=float, default=300, help='run length in seconds')
+    p.add_argument('--status-interval', type=float, default=5, help='GET /api/status period (app.js: 5s)')
+    p.add_argument('--ping-interval', type=float, default=60, help='POST /api/ping period (tab refocus)')
+    p.add_argument('--schedule-interval', type=float, default=0,
+                   help='GET /api/schedule period; 0 = only on page load (app.js behaviour)')
+    p.add_argument('--engine-interval', type=float, default=10,
+                   help='seconds between engine checks (server.CHECK_INTERVAL is 60)')
+    p.add_argument('--window-every', type=float, default=120, help='seconds between attendance windows')
+    p.add_argument('--window-length', type=float, default=90,
+                   help='seconds each window stays open; keep it above server.CHECK_INTERVAL')
+    p.add_argument('--latency', type=float, default=50, help='stub response latency in ms')
+    p.add_argument('--jitter', type=float, default=20, help='stub latency jitter (+/- ms)')
+    p.add_argument('--failure-rate', type=float, default=0.0, help='fraction of stub requests answered 503')
+    p.add_argument('--threads', type=int, default=4, help='gunicorn --threads for the spawned server')
+    p.add_argument('--target', help='use an already running server instead of spawning gunicorn '
+                                    '(start it with SIMKULIAH_BASE=http://127.0.0.1:<stub-port>)')
+    p.add_argument('--target-wait', type=float, default=300,
+                   help='seconds to wait for --target to come up and log in against the stub')
+    p.add_argument('--server-pid', type=int, help='pid to sample when using --target')
+    p.add_argument('--stub-port', type=int, default=0, help='fake SimKuliah port; 0 = pick a free one')
+    p.add_argument('--request-timeout', type=float, default=30, help='browser request timeout in seconds')
+    p.add_argument('--seed', type=int, default=1, help='RNG seed for jitter, failures and staggering')
+    p.add_argument('--json', help='write the report as JSON to this path')
+    p.add_argument('--compare', help='previous JSON report to diff against')
+    p.add_argument('--role', choices=('main', 'stub', 'engines'), default='main', help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parse_args(argv)
+
+    if args.role == 'stub':
+        stub = FakeSimKuliah(args.latency, args.jitter, args.failure_rate,
+                             args.window_every, args.window_length, args.seed)
+        return stub.serve(args.stub_port)
+    if args.role == 'engines':
+        return run_engines(args)
+
+    sys.path.insert(0, HERE)
+    import server
+    if args.window_length <= server.CHECK_INTERVAL:
+        print(f'warning: --window-length {args.window_length:g}s is not above server.CHECK_INTERVAL '
+              f'({server.CHECK_INTERVAL}s); the server engine will miss windows without any load')
+
+    stub_proc = server_proc = engines_proc = None
+    try:
+        stub_proc, stub_url = spawn_stub(argv, args.stub_port or free_port())
+        stub_port = stub_url.rsplit(':', 1)[1]
+
+        if args.target:
+            base_url = args.target.rstrip('/')
+            print(f'Stub SimKuliah at {stub_url}; waiting up to {args.target_wait:g}s for {base_url} '
+                  f'(start it with SIMKULIAH_BASE={stub_url})')
+            server_pid = args.server_pid
+            wait = args.target_wait
+        else:
+            server_proc, base_url = spawn_server(stub_url, args.threads)
+            server_pid = server_proc.pid
+            wait = 10
+
+        logged_in = login_server(base_url, args.request_timeout, wait)
+        engine_running = logged_in and start_server_engine(base_url, args.request_timeout)
+        if not logged_in:
+            print('warning: server login against the stub failed, browsers will see logged_out')
+        elif not engine_running:
+            print('warning: could not start the server engine')
+
+        # Windows are counted from here; drop anything confirmed during setup
+        requests.post(f'{stub_url}/__loadtest/reset', timeout=10)
+        started = time.monotonic()
+        engines_proc = spawn_role('engines', argv, stub_port, stdout=subprocess.PIPE,
+                                  env=dict(os.environ, SIMKULIAH_BASE=stub_url))
+
+        recorder = Recorder()
+        stop_event = Event()
+        pids = {'stub': stub_proc.pid, 'engines': engines_proc.pid, 'clients': os.getpid()}
+        if server_pid:
+            pids = {'server': server_pid, **pids}
+        sampler = ResourceSampler(pids, stop_event, trees=('server',))
+
+        workers = [Thread(target=browser_loop, args=(i, base_url, args, recorder, stop_event), daemon=True)
+                   for i in range(args.browsers)]
+        sampler.start()
+        for worker in workers:
+            worker.start()
+        stop_event.wait(args.duration)
+        sampler.sample()
+        windows = stub_stats(stub_url)['closed_windows']
+        elapsed = time.monotonic() - started
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=args.request_timeout)
+
+        try:
+            out, _ = engines_proc.communicate(timeout=args.request_timeout + 30)
+            engine_data = json.loads(out)
+        except (subprocess.TimeoutExpired, ValueError):
+            print('warning: engines process did not report, engine rows are missing')
+            engine_data = {'samples': {}, 'errors': {}, 'cycles': 0, 'overruns': 0}
+        recorder.merge(engine_data['samples'], engine_data['errors'])
+        stats = stub_stats(stub_url)
+    finally:
+        for proc in (engines_proc, server_proc, stub_proc):
+            stop_process(proc)
+
+    endpoints = recorder.summary(elapsed)
+    browser_rows = [row for name, row in endpoints.items() if not name.startswith('engine')]
+    total_requests = sum(row['requests'] for row in browser_rows)
+    total_errors = sum(row['errors'] for row in browser_rows)
+    attended = [(user, k, lag) for user, k, lag in stats['attended'] if k < windows]
+    lags = sorted(lag for user, _, lag in attended if user > 0)
+    expected = windows * args.engines
+    own_attended = sum(1 for user, _, _ in attended if user == 0)
+    own_expected = windows if engine_running else 0
+
+    config = {key: value for key, value in vars(args).items()
+              if key not in ('json', 'compare', 'target', 'target_wait', 'server_pid', 'stub_port', 'role')}
+    report = {
+        'config': config,
+        'results': {
+            'elapsed_s': round(elapsed, 1),
+            'setup': {'server_logged_in': int(logged_in), 'server_engine_running': int(engine_running)},
+            'endpoints': endpoints,
+            'total': {
+                'requests': total_requests,
+                'errors': total_errors,
+                'throughput_rps': round((total_requests - total_errors) / elapsed, 2),
+            },
+            'resources': sampler.summary(),
+            'attendance': {
+                'windows': expected,
+                'attended': len(lags),
+                'missed': expected - len(lags),
+                'lag_p50_s': round(percentile(lags, 50), 1),
+                'lag_p99_s': round(percentile(lags, 99), 1),
+            },
+            'server_engine': {
+                'windows': own_expected,
+                'attended': own_attended,
+                'missed': own_expected - own_attended,
+            },
+            'engines': {'cycles': engine_data['cycles'], 'overruns': engine_data['overruns']},
+            'stub': {'requests': stats['requests'], 'injected_failures': stats['failures']},
+        },
+    }
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f'Report written to {args.json}')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
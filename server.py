@@ -30,7 +30,8 @@ CORS(app)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-SIMKULIAH_BASE = 'https://simkuliah.usk.ac.id'
+# Override with the SIMKULIAH_BASE env var to point at a local stub (see loadtest.py)
+SIMKULIAH_BASE = os.environ.get('SIMKULIAH_BASE', 'https://simkuliah.usk.ac.id').rstrip('/')
 SIMKULIAH_LOGIN_URL = f'{SIMKULIAH_BASE}/index.php/login/auth'
 SIMKULIAH_ABSENSI_URL = f'{SIMKULIAH_BASE}/index.php/absensi'
 SIMKULIAH_KONFIRMASI_URL = f'{SIMKULIAH_BASE}/index.php/absensi/konfirmasi_kehadiran'